@@ -1,3 +1,4 @@
+use std::io::{BufWriter, Write};
 use std::process::Command as ProcessCommand;
 
 use clap::{Parser, Subcommand};
@@ -376,6 +377,17 @@ enum MacaroonCommand {
 }
 
 pub fn run() -> Result<()> {
+    // `--version` is what scripts and completions call in loops. Answer it
+    // before clap builds the full command tree (every subcommand, every
+    // long_about). Output matches clap's own `llms <version>` line.
+    let mut args = std::env::args_os().skip(1);
+    if let (Some(flag), None) = (args.next(), args.next())
+        && (flag == "--version" || flag == "-V")
+    {
+        print!("{}", version_line());
+        return Ok(());
+    }
+
     let cli = Cli::parse();
 
     match cli.command {
@@ -403,7 +415,7 @@ pub fn run() -> Result<()> {
                         "exec requires --inject ENV=key (or --profile <name>)".into(),
                     ));
                 }
-                cmd_exec(inject, macaroon, command)
+                cmd_exec(inject, macaroon, command, None)
             }
         }
         Command::Status => cmd_status(),
@@ -453,14 +465,19 @@ fn cmd_init() -> Result<()> {
 
 fn cmd_list() -> Result<()> {
     let identity = store::load_identity()?;
-    let store = store::load_store(&identity)?;
-    if store.len() == 0 {
+    let keys = store::load_keys(&identity)?;
+    if keys.is_empty() {
         println!("(empty)");
         return Ok(());
     }
-    for key in store.keys() {
-        println!("{key}");
+    // Agents call `list` in loops and usually pipe it. One locked, buffered
+    // writer batches the listing into a few large writes instead of a lock
+    // and a flush per line on line-buffered stdout.
+    let mut out = BufWriter::new(std::io::stdout().lock());
+    for key in &keys {
+        writeln!(out, "{key}")?;
     }
+    out.flush()?;
     Ok(())
 }
 
@@ -499,8 +516,23 @@ fn cmd_peek(key: &str, chars: usize, macaroon: Option<String>) -> Result<()> {
 /// session is silently auto-minted if none exists — so the user never
 /// has to remember `session-start` for basic use.
 fn gate<'a>(key: &'a str, flag: &Option<String>) -> Result<crate::macaroon::Context<'a>> {
-    let ctx = crate::macaroon::Context::current(key);
-    crate::policy::check_access(&ctx)?;
+    let policy = crate::policy::load_for_cwd()?;
+    gate_ctx(
+        crate::macaroon::Context::current(key),
+        policy.as_ref(),
+        flag,
+    )
+}
+
+/// `gate` for a context and policy the caller has already gathered. Lets
+/// `exec` probe git and parse the policy file once, then check every
+/// injected key against the same inputs.
+fn gate_ctx<'a>(
+    ctx: crate::macaroon::Context<'a>,
+    policy: Option<&crate::policy::Policy>,
+    flag: &Option<String>,
+) -> Result<crate::macaroon::Context<'a>> {
+    crate::policy::check_loaded(policy, &ctx)?;
 
     if let Some(encoded) = crate::macaroon::pick_macaroon(flag) {
         // Explicit macaroon (agent delegation path) — verify as-is.
@@ -526,12 +558,16 @@ fn cmd_set(key: &str, from_stdin: bool) -> Result<()> {
             .read_to_string(&mut buf)
             .map_err(|e| Error::Other(format!("stdin: {e}")))?;
         // Strip a single trailing newline so `echo foo | llms set` does the
-        // intuitive thing. Internal newlines are preserved.
+        // intuitive thing. Internal newlines are preserved. Truncate in place
+        // rather than copying, so no second plaintext buffer is left behind.
         if let Some(stripped) = buf.strip_suffix('\n') {
-            buf = stripped.trim_end_matches('\r').to_string();
+            let len = stripped.trim_end_matches('\r').len();
+            buf.truncate(len);
         }
         buf
     } else {
+        // dialoguer keeps both entries in zeroizing buffers while comparing
+        // and hands back a single copy.
         Password::with_theme(&ColorfulTheme::default())
             .with_prompt(format!("value for {key}"))
             .with_confirmation("confirm", "values do not match")
@@ -577,11 +613,12 @@ fn cmd_status() -> Result<()> {
     let dir = store::store_dir()?;
     let id = store::identity_path()?;
     let st = store::store_path()?;
+    let (id_present, st_present) = (id.exists(), st.exists());
 
     println!("store dir:    {}", dir.display());
     println!(
         "identity:     {}",
-        if id.exists() {
+        if id_present {
             "present"
         } else {
             "missing — run `llms init`"
@@ -589,32 +626,40 @@ fn cmd_status() -> Result<()> {
     );
     println!(
         "store:        {}",
-        if st.exists() {
+        if st_present {
             "present"
         } else {
             "missing — run `llms init`"
         }
     );
 
-    if id.exists() && st.exists() {
+    if id_present && st_present {
         let identity = store::load_identity()?;
-        let store = store::load_store(&identity)?;
-        println!("secrets:      {}", store.len());
+        println!("secrets:      {}", store::load_keys(&identity)?.len());
     }
+    println!(
+        "git:          {}",
+        if crate::macaroon::git_available() {
+            "present"
+        } else {
+            "missing — who/repo/branch are empty"
+        }
+    );
     Ok(())
 }
 
-fn cmd_exec(inject: Vec<String>, macaroon: Option<String>, command: Vec<String>) -> Result<()> {
+/// `base` is a context the caller already gathered (`profile exec`); when
+/// `None`, it is gathered here — but only if there is something to inject.
+fn cmd_exec(
+    inject: Vec<String>,
+    macaroon: Option<String>,
+    command: Vec<String>,
+    base: Option<crate::macaroon::Context<'_>>,
+) -> Result<()> {
     if command.is_empty() {
         return Err(Error::Other("no command provided after `--`".into()));
     }
 
-    let identity = store::load_identity()?;
-    let store = store::load_store(&identity)?;
-
-    let mut process = ProcessCommand::new(&command[0]);
-    process.args(&command[1..]);
-
     let delegated = macaroon.is_some() || std::env::var("LLM_SECRETS_MACAROON").is_ok();
     let event = if delegated {
         "exec.inject.delegated"
@@ -622,16 +667,34 @@ fn cmd_exec(inject: Vec<String>, macaroon: Option<String>, command: Vec<String>)
         "exec.inject"
     };
 
-    for spec in &inject {
-        let (env_var, secret_key) = spec
-            .split_once('=')
-            .ok_or_else(|| Error::Other(format!("invalid --inject {spec:?}, expected ENV=key")))?;
-        let ctx = gate(secret_key, &macaroon)?;
+    // Gate every key before decrypting anything. The context and policy are
+    // gathered once and re-used per key — N injects cost one set of git
+    // probes and one YAML parse.
+    let mut granted = Vec::with_capacity(inject.len());
+    if !inject.is_empty() {
+        let base = base.unwrap_or_else(|| crate::macaroon::Context::current("(exec)"));
+        let policy = crate::policy::load_for_cwd()?;
+        for spec in &inject {
+            let (env_var, secret_key) = spec.split_once('=').ok_or_else(|| {
+                Error::Other(format!("invalid --inject {spec:?}, expected ENV=key"))
+            })?;
+            let ctx = gate_ctx(base.with_key(secret_key), policy.as_ref(), &macaroon)?;
+            granted.push((env_var, ctx));
+        }
+    }
+
+    let identity = store::load_identity()?;
+    let store = store::load_store(&identity)?;
+
+    let mut process = ProcessCommand::new(&command[0]);
+    process.args(&command[1..]);
+
+    for (env_var, ctx) in &granted {
         let value = store
-            .get(secret_key)
-            .ok_or_else(|| Error::KeyNotFound(secret_key.to_string()))?;
+            .get(ctx.key)
+            .ok_or_else(|| Error::KeyNotFound(ctx.key.to_string()))?;
         process.env(env_var, value);
-        let _ = crate::lease::audit(event, &ctx, None);
+        let _ = crate::lease::audit(event, ctx, None);
     }
 
     // Drop the decrypted store before exec'ing the child so plaintext lives
@@ -709,14 +772,17 @@ fn cmd_leases() -> Result<()> {
         println!("(no active leases)");
         return Ok(());
     }
+    let mut out = BufWriter::new(std::io::stdout().lock());
     for l in &set.leases {
-        println!(
+        writeln!(
+            out,
             "{}  expires {}  by {}",
             l.key,
             l.expires_at.to_rfc3339(),
             or_dash(&l.session_who),
-        );
+        )?;
     }
+    out.flush()?;
     Ok(())
 }
 
@@ -726,26 +792,30 @@ fn cmd_audit(json: bool, last: usize) -> Result<()> {
         println!("(no audit entries)");
         return Ok(());
     }
+    let mut out = BufWriter::new(std::io::stdout().lock());
     if json {
         for e in &entries {
-            println!(
+            writeln!(
+                out,
                 "{}",
                 serde_json::to_string(e)
                     .map_err(|err| Error::Other(format!("audit serialise: {err}")))?
-            );
+            )?;
         }
     } else {
         for e in &entries {
-            println!(
+            writeln!(
+                out,
                 "{}  {:12}  {:20}  {}  {}",
                 e.at.to_rfc3339(),
                 e.event,
                 e.key,
                 or_dash(&e.who),
                 e.note.as_deref().unwrap_or(""),
-            );
+            )?;
         }
     }
+    out.flush()?;
     Ok(())
 }
 
@@ -928,7 +998,7 @@ fn cmd_profile_exec(name: &str, ttl_override: Option<String>, command: Vec<Strin
         Some(format!("profile={} command={}", p.name, command[0])),
     );
 
-    cmd_exec(inject, Some(encoded), command)
+    cmd_exec(inject, Some(encoded), command, Some(ctx))
 }
 
 /// Read a macaroon from `--macaroon`, or `LLM_SECRETS_MACAROON`, or stdin
@@ -950,3 +1020,19 @@ fn read_macaroon_input(flag: Option<String>) -> Result<String> {
     }
     Ok(trimmed)
 }
+
+/// The `--version` fast-path output. Kept identical to clap's rendering.
+fn version_line() -> String {
+    format!("llms {}\n", env!("CARGO_PKG_VERSION"))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use clap::CommandFactory;
+
+    #[test]
+    fn version_fast_path_matches_clap() {
+        assert_eq!(version_line(), Cli::command().render_version());
+    }
+}
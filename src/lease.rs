@@ -22,7 +22,7 @@ use serde::{Deserialize, Serialize};
 
 use crate::error::{Error, Result};
 use crate::macaroon::Context;
-use crate::store::store_dir;
+use crate::store::{read_if_exists, remove_if_exists, store_dir, write_secret_file};
 
 const LEASES_FILENAME: &str = "leases.json";
 const AUDIT_FILENAME: &str = "audit.jsonl";
@@ -60,11 +60,9 @@ pub struct LeaseSet {
 
 impl LeaseSet {
     pub fn load() -> Result<Self> {
-        let path = leases_path()?;
-        if !path.exists() {
+        let Some(bytes) = read_if_exists(&leases_path()?)? else {
             return Ok(Self::default());
-        }
-        let bytes = fs::read(&path)?;
+        };
         let set: LeaseSet = serde_json::from_slice(&bytes)
             .map_err(|e| Error::Other(format!("corrupt leases file: {e}")))?;
         Ok(set)
@@ -78,11 +76,7 @@ impl LeaseSet {
         fs::create_dir_all(parent)?;
         let json = serde_json::to_vec_pretty(self)
             .map_err(|e| Error::Other(format!("leases serialise: {e}")))?;
-        let tmp = parent.join(".leases.json.tmp");
-        fs::write(&tmp, &json)?;
-        set_perms(&tmp)?;
-        fs::rename(&tmp, &path)?;
-        Ok(())
+        write_secret_file(&path, &json)
     }
 
     /// Drop expired leases. Returns the number removed.
@@ -160,22 +154,26 @@ pub fn audit(event: &str, ctx: &Context, note: Option<String>) -> Result<()> {
         pid: std::process::id(),
         note,
     };
-    let line =
-        serde_json::to_string(&entry).map_err(|e| Error::Other(format!("audit serialise: {e}")))?;
+    let mut line =
+        serde_json::to_vec(&entry).map_err(|e| Error::Other(format!("audit serialise: {e}")))?;
+    line.push(b'\n');
 
+    // One write(2) per record: `writeln!` on an unbuffered File issues the
+    // body and the newline separately, which lets concurrent appenders
+    // interleave mid-line.
     let mut f = OpenOptions::new().create(true).append(true).open(&path)?;
     set_perms(&path)?;
-    writeln!(f, "{line}")?;
+    f.write_all(&line)?;
     Ok(())
 }
 
 /// Read the last `n` audit entries. Returns oldest-first.
 pub fn read_recent(n: usize) -> Result<Vec<AuditEntry>> {
-    let path = audit_path()?;
-    if !path.exists() {
+    let Some(bytes) = read_if_exists(&audit_path()?)? else {
         return Ok(vec![]);
-    }
-    let text = fs::read_to_string(&path)?;
+    };
+    let text =
+        String::from_utf8(bytes).map_err(|e| Error::Other(format!("corrupt audit log: {e}")))?;
     let mut all: Vec<AuditEntry> = text
         .lines()
         .filter(|l| !l.trim().is_empty())
@@ -203,10 +201,7 @@ pub fn revoke_all() -> Result<usize> {
     audit("revoke.all", &ctx, Some(format!("revoked {count} leases")))?;
 
     crate::macaroon::delete_root_key()?;
-    let session_path = crate::macaroon::session_path()?;
-    if session_path.exists() {
-        fs::remove_file(session_path)?;
-    }
+    remove_if_exists(&crate::macaroon::session_path()?)?;
     Ok(count)
 }
 
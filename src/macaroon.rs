@@ -28,8 +28,9 @@
 //! widen the one it holds — every caveat is enforced by the chain.
 
 use std::fs;
-use std::path::{Path, PathBuf};
-use std::process::Command as ProcessCommand;
+use std::path::PathBuf;
+use std::process::{Command as ProcessCommand, Stdio};
+use std::sync::OnceLock;
 
 use base64::{Engine, engine::general_purpose::URL_SAFE_NO_PAD as B64URL};
 use chrono::{DateTime, Duration, Utc};
@@ -41,7 +42,7 @@ use subtle::ConstantTimeEq;
 
 use crate::agent;
 use crate::error::{Error, Result};
-use crate::store::store_dir;
+use crate::store::{read_if_exists, remove_if_exists, store_dir, write_secret_file};
 
 const ROOT_KEY_FILENAME: &str = "root.key";
 const SESSION_FILENAME: &str = "session.json";
@@ -81,19 +82,11 @@ pub fn rotate_root_key() -> Result<()> {
 /// Delete the root key — the killswitch primitive. Every macaroon (root and
 /// derived) becomes unverifiable in O(1).
 pub fn delete_root_key() -> Result<()> {
-    let path = root_key_path()?;
-    if path.exists() {
-        fs::remove_file(path)?;
-    }
-    Ok(())
+    remove_if_exists(&root_key_path()?)
 }
 
 fn load_root_key() -> Result<[u8; ROOT_KEY_LEN]> {
-    let path = root_key_path()?;
-    if !path.exists() {
-        return Err(Error::NoSession);
-    }
-    let bytes = fs::read(&path)?;
+    let bytes = read_if_exists(&root_key_path()?)?.ok_or(Error::NoSession)?;
     if bytes.len() != ROOT_KEY_LEN {
         return Err(Error::Other("root key has wrong length".into()));
     }
@@ -128,7 +121,7 @@ pub enum Caveat {
 }
 
 /// Context against which caveats are evaluated. Always built fresh via
-/// `Context::current()` — never cached.
+/// `Context::current()` — never persisted across invocations.
 pub struct Context<'a> {
     pub key: &'a str,
     pub now: DateTime<Utc>,
@@ -142,16 +135,44 @@ impl<'a> Context<'a> {
     /// Gather the current context from the environment for the given key.
     /// Best-effort: missing fields become empty strings, and a caveat that
     /// requires a missing field will simply not match.
+    ///
+    /// The three git probes are independent subprocesses, so they run side
+    /// by side on scoped threads rather than as three fork+exec round trips
+    /// in series.
     pub fn current(key: &'a str) -> Self {
+        let (who, repo, branch) = std::thread::scope(|s| {
+            let who = s.spawn(|| git("config", &["user.email"]).unwrap_or_default());
+            let repo = s.spawn(detect_repo);
+            let branch = git("rev-parse", &["--abbrev-ref", "HEAD"]).unwrap_or_default();
+            (
+                who.join().unwrap_or_else(|e| std::panic::resume_unwind(e)),
+                repo.join().unwrap_or_else(|e| std::panic::resume_unwind(e)),
+                branch,
+            )
+        });
         Self {
             key,
             now: Utc::now(),
-            who: git("config", &["user.email"]).unwrap_or_default(),
-            repo: detect_repo(),
-            branch: git("rev-parse", &["--abbrev-ref", "HEAD"]).unwrap_or_default(),
+            who,
+            repo,
+            branch,
             agent: agent::detect_or_none(),
         }
     }
+
+    /// Re-target an already-gathered context at another key. Used when one
+    /// invocation checks several keys (`exec --inject` ×N) so the git probes
+    /// run once rather than once per key. `now` is refreshed.
+    pub fn with_key<'b>(&self, key: &'b str) -> Context<'b> {
+        Context {
+            key,
+            now: Utc::now(),
+            who: self.who.clone(),
+            repo: self.repo.clone(),
+            branch: self.branch.clone(),
+            agent: self.agent.clone(),
+        }
+    }
 }
 
 impl Caveat {
@@ -268,11 +289,7 @@ impl Macaroon {
 
     /// Load the root macaroon from `session.json`. Errors if no session exists.
     pub fn load_root() -> Result<Self> {
-        let path = session_path()?;
-        if !path.exists() {
-            return Err(Error::NoSession);
-        }
-        let bytes = fs::read(&path)?;
+        let bytes = read_if_exists(&session_path()?)?.ok_or(Error::NoSession)?;
         serde_json::from_slice(&bytes)
             .map_err(|e| Error::Other(format!("corrupt session.json: {e}")))
     }
@@ -380,16 +397,16 @@ fn mint_with_caveats(caveats: Vec<Caveat>) -> Result<Macaroon> {
 /// caveat that won't match anything (you'll need to renew once `git config`
 /// is set).
 pub fn gather_root_caveats(ttl: Duration) -> Vec<Caveat> {
+    let ctx = Context::current("(root)");
     let mut caveats = Vec::new();
-    if let Some(who) = git("config", &["user.email"]) {
-        caveats.push(Caveat::WhoEq(who));
+    if !ctx.who.is_empty() {
+        caveats.push(Caveat::WhoEq(ctx.who));
     }
-    let repo = detect_repo();
-    if !repo.is_empty() {
-        caveats.push(Caveat::RepoEq(repo));
+    if !ctx.repo.is_empty() {
+        caveats.push(Caveat::RepoEq(ctx.repo));
     }
-    if let Some(branch) = git("rev-parse", &["--abbrev-ref", "HEAD"]) {
-        caveats.push(Caveat::BranchEq(branch));
+    if !ctx.branch.is_empty() {
+        caveats.push(Caveat::BranchEq(ctx.branch));
     }
     if let Some(agent_name) = agent::detect() {
         caveats.push(Caveat::AgentEq(agent_name.0));
@@ -430,10 +447,54 @@ pub fn parse_duration(input: &str) -> Result<Duration> {
 
 // ---- git helpers ----------------------------------------------------------
 
+/// Whether a `git` executable is on `$PATH`. A plain directory scan — no
+/// process is spawned — done once per process. When git is absent every
+/// probe short-circuits to `None` instead of failing one spawn at a time.
+pub fn git_available() -> bool {
+    static AVAILABLE: OnceLock<bool> = OnceLock::new();
+    *AVAILABLE.get_or_init(|| on_path("git"))
+}
+
+fn on_path(bin: &str) -> bool {
+    // No $PATH at all: let the spawn use the platform default search.
+    let Some(paths) = std::env::var_os("PATH") else {
+        return true;
+    };
+    find_in(&paths, bin)
+}
+
+/// Whether `bin` is an executable file in any directory of `paths` (a
+/// `$PATH`-style list). Split from `on_path` so tests need not touch `$PATH`.
+fn find_in(paths: &std::ffi::OsStr, bin: &str) -> bool {
+    std::env::split_paths(paths).any(|dir| {
+        let candidate = dir.join(bin);
+        is_executable(&candidate)
+            || (cfg!(windows) && is_executable(&candidate.with_extension("exe")))
+    })
+}
+
+#[cfg(unix)]
+fn is_executable(path: &std::path::Path) -> bool {
+    use std::os::unix::fs::PermissionsExt;
+    fs::metadata(path).is_ok_and(|m| m.is_file() && m.permissions().mode() & 0o111 != 0)
+}
+
+#[cfg(not(unix))]
+fn is_executable(path: &std::path::Path) -> bool {
+    path.is_file()
+}
+
+/// Run a git probe and return its trimmed stdout. Only stdout is piped:
+/// stderr is never read (a failed probe is just `None`), so it goes to
+/// /dev/null rather than through a pipe we would drain and discard.
 fn git(cmd: &str, args: &[&str]) -> Option<String> {
+    if !git_available() {
+        return None;
+    }
     let out = ProcessCommand::new("git")
         .arg(cmd)
         .args(args)
+        .stderr(Stdio::null())
         .output()
         .ok()?;
     if !out.status.success() {
@@ -459,35 +520,6 @@ fn detect_repo() -> String {
     stripped.to_string()
 }
 
-// ---- file helpers ---------------------------------------------------------
-
-fn write_secret_file(path: &Path, bytes: &[u8]) -> Result<()> {
-    let parent = path
-        .parent()
-        .ok_or_else(|| Error::Other(format!("invalid path: {}", path.display())))?;
-    let tmp = parent.join(format!(
-        ".{}.tmp",
-        path.file_name()
-            .and_then(|s| s.to_str())
-            .unwrap_or("llm-secrets")
-    ));
-    fs::write(&tmp, bytes)?;
-    set_perms(&tmp)?;
-    fs::rename(&tmp, path)?;
-    Ok(())
-}
-
-#[cfg(unix)]
-fn set_perms(path: &Path) -> Result<()> {
-    use std::os::unix::fs::PermissionsExt;
-    fs::set_permissions(path, fs::Permissions::from_mode(0o600))?;
-    Ok(())
-}
-#[cfg(not(unix))]
-fn set_perms(_path: &Path) -> Result<()> {
-    Ok(())
-}
-
 // ---- helpers used by the CLI ---------------------------------------------
 
 /// Try the explicit flag first, then fall back to the env var.
@@ -540,6 +572,39 @@ mod tests {
         assert!(future.check(&ctx_for("x")).is_ok());
     }
 
+    #[test]
+    fn with_key_keeps_gathered_fields() {
+        let base = ctx_for("db");
+        let other = base.with_key("api_key");
+        assert_eq!(other.key, "api_key");
+        assert_eq!(other.who, base.who);
+        assert_eq!(other.repo, base.repo);
+        assert_eq!(other.branch, base.branch);
+        assert_eq!(other.agent, base.agent);
+    }
+
+    #[test]
+    fn find_in_locates_executables_only() {
+        let dir = tempfile::tempdir().unwrap();
+        let tool = dir.path().join("fake-tool");
+        fs::write(&tool, b"").unwrap();
+        #[cfg(unix)]
+        {
+            use std::os::unix::fs::PermissionsExt;
+            fs::set_permissions(&tool, fs::Permissions::from_mode(0o755)).unwrap();
+        }
+        let paths = std::env::join_paths([dir.path()]).unwrap();
+        assert!(find_in(&paths, "fake-tool"));
+        assert!(!find_in(&paths, "missing-tool"));
+
+        #[cfg(unix)]
+        {
+            use std::os::unix::fs::PermissionsExt;
+            fs::set_permissions(&tool, fs::Permissions::from_mode(0o644)).unwrap();
+            assert!(!find_in(&paths, "fake-tool"));
+        }
+    }
+
     #[test]
     fn canonical_bytes_are_stable() {
         let c1 = Caveat::SecretEq("db".into());
@@ -180,8 +180,7 @@ fn call_tool(name: &str, args: &Value) -> Result<Value> {
     match name {
         "list_secrets" => {
             let identity = store::load_identity()?;
-            let st = store::load_store(&identity)?;
-            let keys: Vec<&str> = st.keys().collect();
+            let keys = store::load_keys(&identity)?;
             Ok(json!({
                 "content": [{ "type": "text", "text": keys.join("\n") }],
                 "isError": false
@@ -238,22 +237,24 @@ fn call_tool(name: &str, args: &Value) -> Result<Value> {
             let dir = store::store_dir()?;
             let id = store::identity_path()?;
             let st_path = store::store_path()?;
-            let count = if id.exists() && st_path.exists() {
+            let (id_present, st_present) = (id.exists(), st_path.exists());
+            let count = if id_present && st_present {
                 let identity = store::load_identity()?;
-                store::load_store(&identity)?.len()
+                store::load_keys(&identity)?.len()
             } else {
                 0
             };
             Ok(text_result(format!(
-                "store: {}\nidentity: {}\nstore: {}\nsecrets: {}",
+                "store: {}\nidentity: {}\nstore: {}\nsecrets: {}\ngit: {}",
                 dir.display(),
-                if id.exists() { "present" } else { "missing" },
-                if st_path.exists() {
+                if id_present { "present" } else { "missing" },
+                if st_present { "present" } else { "missing" },
+                count,
+                if crate::macaroon::git_available() {
                     "present"
                 } else {
                     "missing"
-                },
-                count
+                }
             )))
         }
 
@@ -28,9 +28,8 @@
 //! - `max_ttl` constrains the lease TTL (#7); for v0.3 it is parsed and
 //!   stored but not yet enforced.
 
-use std::fs;
 use std::path::PathBuf;
-use std::process::Command as ProcessCommand;
+use std::process::{Command as ProcessCommand, Stdio};
 
 use serde::{Deserialize, Serialize};
 
@@ -141,18 +140,21 @@ pub fn load_for_cwd() -> Result<Option<Policy>> {
         Some(root) => root.join(POLICY_FILENAME),
         None => PathBuf::from(POLICY_FILENAME),
     };
-    if !path.exists() {
+    let Some(bytes) = crate::store::read_if_exists(&path)? else {
         return Ok(None);
-    }
-    let bytes = fs::read(&path)?;
+    };
     let policy: Policy = serde_yaml::from_slice(&bytes)
         .map_err(|e| Error::Other(format!("policy file invalid YAML: {e}")))?;
     Ok(Some(policy))
 }
 
 fn find_git_root() -> Option<PathBuf> {
+    if !crate::macaroon::git_available() {
+        return None;
+    }
     let out = ProcessCommand::new("git")
         .args(["rev-parse", "--show-toplevel"])
+        .stderr(Stdio::null())
         .output()
         .ok()?;
     if !out.status.success() {
@@ -172,7 +174,13 @@ fn find_git_root() -> Option<PathBuf> {
 ///   are the only gate.
 /// - If there is a policy file, evaluate the request context against it.
 pub fn check_access(ctx: &Context) -> Result<()> {
-    let policy = match load_for_cwd()? {
+    check_loaded(load_for_cwd()?.as_ref(), ctx)
+}
+
+/// `check_access` against a policy the caller already loaded. Lets one
+/// invocation that checks several keys find and parse the YAML once.
+pub fn check_loaded(policy: Option<&Policy>, ctx: &Context) -> Result<()> {
+    let policy = match policy {
         Some(p) => p,
         None => return Ok(()),
     };
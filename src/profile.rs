@@ -14,7 +14,6 @@
 //! vimmable, dotfile-managed. Stealing it confers no authority.
 
 use std::collections::BTreeMap;
-use std::fs;
 use std::path::PathBuf;
 
 use chrono::Duration;
@@ -74,13 +73,14 @@ struct ProfileToml {
 
 fn read_profiles_file() -> Result<BTreeMap<String, ProfileToml>> {
     let path = profiles_path()?;
-    if !path.exists() {
-        return Err(Error::Other(format!(
+    let bytes = crate::store::read_if_exists(&path)?.ok_or_else(|| {
+        Error::Other(format!(
             "no profiles file at {} — create one to use profiles",
             path.display()
-        )));
-    }
-    let text = fs::read_to_string(&path)?;
+        ))
+    })?;
+    let text = String::from_utf8(bytes)
+        .map_err(|e| Error::Other(format!("profiles.toml invalid: {e}")))?;
     let map: BTreeMap<String, ProfileToml> =
         toml::from_str(&text).map_err(|e| Error::Other(format!("profiles.toml invalid: {e}")))?;
     Ok(map)
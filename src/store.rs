@@ -10,13 +10,16 @@
 
 use std::collections::BTreeMap;
 use std::fs;
-use std::io::{Read, Write};
+use std::io::{ErrorKind, Read, Write};
 use std::path::{Path, PathBuf};
 use std::str::FromStr;
+use std::sync::OnceLock;
 
 use age::secrecy::ExposeSecret;
 use age::x25519::{Identity, Recipient};
+use serde::de::IgnoredAny;
 use serde::{Deserialize, Serialize};
+use zeroize::{Zeroize, Zeroizing};
 
 use crate::error::{Error, Result};
 
@@ -31,6 +34,12 @@ const STORE_DIR_ENV: &str = "LLM_SECRETS_DIR";
 /// 2. `$XDG_DATA_HOME/llm-secrets` (default `~/.local/share/llm-secrets`)
 /// 3. `~/.llm-secrets` (legacy fallback — used if it exists and the XDG
 ///    path does not, so existing installs keep working without migration)
+///
+/// Every path helper goes through here. Once the XDG path is seen to exist
+/// the answer cannot go stale, so it is kept for the rest of the process.
+/// The legacy fallback is re-probed each call: a long-lived `llms mcp`
+/// must pick up a `mv ~/.llm-secrets ~/.local/share/llm-secrets` made while
+/// it runs. The override is re-read each call.
 pub fn store_dir() -> Result<PathBuf> {
     if let Ok(custom) = std::env::var(STORE_DIR_ENV)
         && !custom.is_empty()
@@ -38,6 +47,11 @@ pub fn store_dir() -> Result<PathBuf> {
         return Ok(PathBuf::from(custom));
     }
 
+    static XDG_PRESENT: OnceLock<PathBuf> = OnceLock::new();
+    if let Some(dir) = XDG_PRESENT.get() {
+        return Ok(dir.clone());
+    }
+
     let xdg = dirs::data_dir()
         .ok_or_else(|| Error::Other("could not determine data directory".into()))?
         .join("llm-secrets");
@@ -50,7 +64,7 @@ pub fn store_dir() -> Result<PathBuf> {
     // XDG doesn't exist but legacy does → use legacy (existing installs).
     // Neither exists → use XDG (new install will create it via `init`).
     if xdg.exists() {
-        Ok(xdg)
+        Ok(XDG_PRESENT.get_or_init(|| xdg).clone())
     } else if legacy.exists() {
         Ok(legacy)
     } else {
@@ -67,21 +81,22 @@ pub fn store_path() -> Result<PathBuf> {
 }
 
 /// In-memory representation of the decrypted store. Drop as soon as possible.
+/// Values are zeroized on drop.
 #[derive(Default, Serialize, Deserialize)]
 pub struct Store {
     #[serde(default)]
     secrets: BTreeMap<String, String>,
 }
 
-impl Store {
-    pub fn keys(&self) -> impl Iterator<Item = &str> {
-        self.secrets.keys().map(String::as_str)
-    }
-
-    pub fn len(&self) -> usize {
-        self.secrets.len()
+impl Drop for Store {
+    fn drop(&mut self) {
+        for value in self.secrets.values_mut() {
+            value.zeroize();
+        }
     }
+}
 
+impl Store {
     pub fn contains(&self, key: &str) -> bool {
         self.secrets.contains_key(key)
     }
@@ -90,13 +105,19 @@ impl Store {
         self.secrets.get(key).map(String::as_str)
     }
 
+    /// Insert or replace a secret. A replaced value is zeroized.
     pub fn insert(&mut self, key: String, value: String) {
-        self.secrets.insert(key, value);
+        if let Some(mut old) = self.secrets.insert(key, value) {
+            old.zeroize();
+        }
     }
 
-    pub fn remove(&mut self, key: &str) -> Result<String> {
+    /// Remove a secret. The value comes back wrapped so it is zeroized
+    /// whenever the caller drops it.
+    pub fn remove(&mut self, key: &str) -> Result<Zeroizing<String>> {
         self.secrets
             .remove(key)
+            .map(Zeroizing::new)
             .ok_or_else(|| Error::KeyNotFound(key.to_string()))
     }
 }
@@ -131,21 +152,45 @@ pub fn init() -> Result<(PathBuf, PathBuf)> {
 /// initialised.
 pub fn load_identity() -> Result<Identity> {
     let path = identity_path()?;
-    if !path.exists() {
-        return Err(Error::StoreNotFound);
-    }
-    let contents = fs::read_to_string(&path)?;
+    let bytes = read_if_exists(&path)?.ok_or(Error::StoreNotFound)?;
+    let contents = std::str::from_utf8(&bytes)
+        .map_err(|e| Error::Other(format!("invalid identity file: {e}")))?;
     Identity::from_str(contents.trim())
         .map_err(|e| Error::Other(format!("invalid identity file: {e}")))
 }
 
 /// Decrypt and parse the store. Errors if not initialised.
 pub fn load_store(identity: &Identity) -> Result<Store> {
-    let path = store_path()?;
-    if !path.exists() {
-        return Err(Error::StoreNotFound);
+    let mut plaintext = decrypt_store(identity)?;
+    let store = serde_json::from_slice(&plaintext);
+    plaintext.zeroize();
+    store.map_err(|e| Error::Other(format!("corrupt store: {e}")))
+}
+
+/// Decrypt the store and return only its key names, sorted. Values are
+/// skipped by the parser, so no secret is ever copied into a `String`.
+/// Used by `list` and `status`, which never need a value.
+pub fn load_keys(identity: &Identity) -> Result<Vec<String>> {
+    let mut plaintext = decrypt_store(identity)?;
+    let keys = parse_keys(&plaintext);
+    plaintext.zeroize();
+    keys
+}
+
+fn parse_keys(plaintext: &[u8]) -> Result<Vec<String>> {
+    #[derive(Deserialize)]
+    struct KeysOnly {
+        #[serde(default)]
+        secrets: BTreeMap<String, IgnoredAny>,
     }
-    let ciphertext = fs::read(&path)?;
+    let parsed: KeysOnly = serde_json::from_slice(plaintext)
+        .map_err(|e| Error::Other(format!("corrupt store: {e}")))?;
+    Ok(parsed.secrets.into_keys().collect())
+}
+
+fn decrypt_store(identity: &Identity) -> Result<Vec<u8>> {
+    let path = store_path()?;
+    let ciphertext = read_if_exists(&path)?.ok_or(Error::StoreNotFound)?;
 
     let decryptor =
         age::Decryptor::new(&ciphertext[..]).map_err(|e| Error::Decryption(e.to_string()))?;
@@ -154,14 +199,14 @@ pub fn load_store(identity: &Identity) -> Result<Store> {
         .decrypt(std::iter::once(identity as &dyn age::Identity))
         .map_err(|e| Error::Decryption(e.to_string()))?;
 
-    let mut plaintext = Vec::new();
+    // age's payload overhead means plaintext is never longer than the
+    // ciphertext, so one allocation up front avoids regrowing the buffer —
+    // each regrow would leave a stale copy of plaintext in freed memory.
+    let mut plaintext = Vec::with_capacity(ciphertext.len());
     reader
         .read_to_end(&mut plaintext)
         .map_err(|e| Error::Decryption(e.to_string()))?;
-
-    let store: Store = serde_json::from_slice(&plaintext)
-        .map_err(|e| Error::Other(format!("corrupt store: {e}")))?;
-    Ok(store)
+    Ok(plaintext)
 }
 
 /// Encrypt and write the store atomically.
@@ -185,9 +230,7 @@ pub fn save_store(store: &Store, recipient: &Recipient) -> Result<()> {
         .finish()
         .map_err(|e| Error::Encryption(e.to_string()))?;
 
-    write_atomic(&path, &ciphertext)?;
-    set_file_perms(&path)?;
-    Ok(())
+    write_secret_file(&path, &ciphertext)
 }
 
 /// Rotate the age keypair: decrypt the store under the current identity,
@@ -220,37 +263,75 @@ pub fn rotate_age_key() -> Result<()> {
 
 // ---- atomic file helpers --------------------------------------------------
 
-fn write_atomic(path: &Path, bytes: &[u8]) -> Result<()> {
+/// Read a file, or `None` if it does not exist. One `open` instead of an
+/// `exists()` stat followed by the read — and no window between the two.
+pub(crate) fn read_if_exists(path: &Path) -> Result<Option<Vec<u8>>> {
+    match fs::read(path) {
+        Ok(bytes) => Ok(Some(bytes)),
+        Err(e) if e.kind() == ErrorKind::NotFound => Ok(None),
+        Err(e) => Err(e.into()),
+    }
+}
+
+/// Remove a file; a file that is already gone is not an error.
+pub(crate) fn remove_if_exists(path: &Path) -> Result<()> {
+    match fs::remove_file(path) {
+        Ok(()) => Ok(()),
+        Err(e) if e.kind() == ErrorKind::NotFound => Ok(()),
+        Err(e) => Err(e.into()),
+    }
+}
+
+/// Write `bytes` to `path` atomically: one write to a sibling temp file,
+/// fsync, then a rename. The temp file is created mode 0600, so the bytes
+/// are never readable by group/other — not even before a later chmod.
+pub(crate) fn write_secret_file(path: &Path, bytes: &[u8]) -> Result<()> {
     let parent = path
         .parent()
         .ok_or_else(|| Error::Other(format!("invalid path: {}", path.display())))?;
     let tmp = parent.join(format!(
-        ".{}.tmp",
+        ".{}.{}.tmp",
         path.file_name()
             .and_then(|s| s.to_str())
-            .unwrap_or("llm-secrets")
+            .unwrap_or("llm-secrets"),
+        std::process::id()
     ));
-    fs::write(&tmp, bytes)?;
-    fs::rename(&tmp, path)?;
-    Ok(())
-}
-
-fn write_secret_file(path: &Path, bytes: &[u8]) -> Result<()> {
-    write_atomic(path, bytes)?;
-    set_file_perms(path)?;
-    Ok(())
+    // A leftover from a crashed writer that happened to share our pid.
+    let _ = fs::remove_file(&tmp);
+    let result = (|| -> Result<()> {
+        let mut f = create_private(&tmp)?;
+        f.write_all(bytes)?;
+        // Flush to disk before the rename, or a crash can leave `path`
+        // pointing at an empty file — for store.age that is every secret gone.
+        f.sync_all()?;
+        drop(f);
+        fs::rename(&tmp, path)?;
+        Ok(())
+    })();
+    if result.is_err() {
+        // The per-pid name is never reused, so a failed write must not leave
+        // its temp file (possibly a copy of the identity key) behind.
+        let _ = fs::remove_file(&tmp);
+    }
+    result
 }
 
 #[cfg(unix)]
-fn set_file_perms(path: &Path) -> Result<()> {
-    use std::os::unix::fs::PermissionsExt;
-    fs::set_permissions(path, fs::Permissions::from_mode(0o600))?;
-    Ok(())
+fn create_private(path: &Path) -> Result<fs::File> {
+    use std::os::unix::fs::OpenOptionsExt;
+    Ok(fs::OpenOptions::new()
+        .write(true)
+        .create_new(true)
+        .mode(0o600)
+        .open(path)?)
 }
 
 #[cfg(not(unix))]
-fn set_file_perms(_path: &Path) -> Result<()> {
-    Ok(())
+fn create_private(path: &Path) -> Result<fs::File> {
+    Ok(fs::OpenOptions::new()
+        .write(true)
+        .create_new(true)
+        .open(path)?)
 }
 
 #[cfg(unix)]
@@ -273,17 +354,21 @@ fn set_dir_perms(_path: &Path) -> Result<()> {
 /// - Otherwise: first `chars` + `*`s + last `chars`.
 pub fn mask(value: &str, chars: usize) -> String {
     let chars_count = value.chars().count();
-    if chars == 0 || chars_count <= chars * 2 {
+    if chars == 0 || chars_count <= chars.saturating_mul(2) {
         return "*".repeat(chars_count.max(4));
     }
-    let prefix: String = value.chars().take(chars).collect();
-    let suffix: String = value.chars().skip(chars_count - chars).collect();
-    format!(
-        "{}{}{}",
-        prefix,
-        "*".repeat(chars_count - 2 * chars),
-        suffix
-    )
+    // Byte offsets of the revealed ends, so the result is built in one
+    // allocation from two slices and a run of `*`s.
+    let byte_at = |n: usize| value.char_indices().nth(n).map_or(value.len(), |(i, _)| i);
+    let prefix_end = byte_at(chars);
+    let suffix_start = byte_at(chars_count - chars);
+    let hidden = chars_count - 2 * chars;
+
+    let mut out = String::with_capacity(prefix_end + hidden + value.len() - suffix_start);
+    out.push_str(&value[..prefix_end]);
+    out.extend(std::iter::repeat_n('*', hidden));
+    out.push_str(&value[suffix_start..]);
+    out
 }
 
 #[cfg(test)]
@@ -300,21 +385,60 @@ mod tests {
         assert_eq!(mask("abc", 4), "****");
     }
 
+    #[test]
+    fn mask_multibyte_value() {
+        // Slices on char boundaries, not bytes.
+        assert_eq!(mask("pässwörd-ünïcode", 3), "päs**********ode");
+    }
+
     #[test]
     fn mask_exactly_at_threshold() {
         // len == 2 * chars → fully masked
         assert_eq!(mask("abcdefgh", 4), "********");
     }
 
+    #[cfg(unix)]
+    #[test]
+    fn secret_file_is_private_and_replaced() {
+        use std::os::unix::fs::PermissionsExt;
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("secret");
+        write_secret_file(&path, b"one").unwrap();
+        write_secret_file(&path, b"two").unwrap();
+        assert_eq!(fs::read(&path).unwrap(), b"two");
+        let mode = fs::metadata(&path).unwrap().permissions().mode();
+        assert_eq!(mode & 0o777, 0o600);
+        // No temp files left behind.
+        assert_eq!(fs::read_dir(dir.path()).unwrap().count(), 1);
+    }
+
+    #[test]
+    fn failed_secret_write_leaves_no_temp_file() {
+        let dir = tempfile::tempdir().unwrap();
+        // A non-empty directory at the target makes the rename fail.
+        let path = dir.path().join("secret");
+        fs::create_dir_all(path.join("inner")).unwrap();
+        assert!(write_secret_file(&path, b"one").is_err());
+        assert_eq!(fs::read_dir(dir.path()).unwrap().count(), 1);
+    }
+
+    #[test]
+    fn parse_keys_skips_values() {
+        let keys = parse_keys(br#"{"secrets":{"b":"2","a":"1"}}"#).unwrap();
+        assert_eq!(keys, ["a", "b"]);
+        assert!(parse_keys(b"{}").unwrap().is_empty());
+        assert!(parse_keys(b"not json").is_err());
+    }
+
     #[test]
     fn store_roundtrip_in_memory() {
         let mut s = Store::default();
         s.insert("a".into(), "1".into());
         s.insert("b".into(), "2".into());
-        assert_eq!(s.len(), 2);
         assert!(s.contains("a"));
+        assert!(s.contains("b"));
         assert_eq!(s.get("a"), Some("1"));
-        assert_eq!(s.remove("a").unwrap(), "1");
+        assert_eq!(*s.remove("a").unwrap(), "1");
         assert!(!s.contains("a"));
     }
 }
@@ -33,15 +33,20 @@ fn help_does_not_advertise_get() {
         .stdout(predicate::str::contains("\n  get\n").not());
 }
 
-/// `--version` should print the crate version.
+/// `--version` and `-V` should print exactly `llms <crate version>`.
 #[test]
 fn version_flag_works() {
-    Command::cargo_bin("llms")
-        .unwrap()
-        .arg("--version")
-        .assert()
-        .success()
-        .stdout(predicate::str::contains(env!("CARGO_PKG_VERSION")));
+    for flag in ["--version", "-V"] {
+        Command::cargo_bin("llms")
+            .unwrap()
+            .arg(flag)
+            .assert()
+            .success()
+            .stdout(predicate::str::diff(format!(
+                "llms {}\n",
+                env!("CARGO_PKG_VERSION")
+            )));
+    }
 }
 
 // ---- end-to-end round trip ------------------------------------------------
@@ -83,7 +88,8 @@ fn init_creates_store() {
         .arg("status")
         .assert()
         .success()
-        .stdout(predicate::str::contains("secrets:      0"));
+        .stdout(predicate::str::contains("secrets:      0"))
+        .stdout(predicate::str::contains("git:"));
 }
 
 #[test]
@@ -172,6 +178,40 @@ fn exec_injects_secret_into_child_env() {
         .stdout(predicate::str::diff("sk-test-12345"));
 }
 
+/// Several `--inject` flags in one call: every key is gated against the
+/// same gathered context and all of them reach the child.
+#[test]
+fn exec_injects_multiple_secrets() {
+    let dir = fresh_store();
+    let env_dir = dir.path();
+
+    for (key, value) in [("api_key", "sk-aaa"), ("db_password", "hunter2")] {
+        llms()
+            .env("LLM_SECRETS_DIR", env_dir)
+            .args(["set", key, "--stdin"])
+            .write_stdin(value)
+            .assert()
+            .success();
+    }
+
+    llms()
+        .env("LLM_SECRETS_DIR", env_dir)
+        .args([
+            "exec",
+            "--inject",
+            "API=api_key",
+            "--inject",
+            "DB=db_password",
+            "--",
+            "sh",
+            "-c",
+            "printf '%s:%s' \"$API\" \"$DB\"",
+        ])
+        .assert()
+        .success()
+        .stdout(predicate::str::diff("sk-aaa:hunter2"));
+}
+
 #[test]
 fn peek_on_missing_key_errors() {
     let dir = fresh_store();